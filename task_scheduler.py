@@ -1,64 +1,129 @@
 import argparse
-import subprocess
+import asyncio
+import csv
+import os
+import shutil
+import sys
 import time
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Tuple, Optional
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from graphlib import CycleError, TopologicalSorter
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Tuple, Optional
 
-# Task class to store schema data
+# Task types accepted in the input file and the parameters each one requires
+_SCHEMAS: Dict[str, frozenset] = {
+    'resolve': frozenset({'fqdn'}),
+    'traceroute': frozenset({'count', 'endpoint'}),
+    'iperf3': frozenset({'endpoint', 'port', 'duration'}),
+}
+
+# Only the last _OUTPUT_TAIL_BYTES of each task output stream are kept
+_OUTPUT_TAIL_BYTES = 64 * 1024
+_READ_CHUNK_BYTES = 4096
+
+# Task class to store schema data; parameters are a read-only view and are left
+# out of the hash since mapping views are not hashable
+@dataclass(frozen=True, slots=True)
 class Task:
-    def __init__(self, name: str, duration: int, dependencies: List[str], task_type: str, parameters: Dict[str, str]):
-        self.name = name
-        self.duration = duration
-        self.dependencies = dependencies
-        self.task_type = task_type
-        self.parameters = parameters
+    name: str
+    duration: int
+    dependencies: Tuple[str, ...]
+    task_type: str
+    parameters: Mapping[str, str] = field(hash=False)
+
+# Dependency graph shared by validation, runtime estimation and scheduling.
+# Tasks are identified by their index in `tasks`; all per-task state is kept
+# in parallel arrays indexed by that id. Dependencies are also flattened into
+# CSR form: the deps of task t are dep_indices[dep_indptr[t]:dep_indptr[t + 1]].
+class TaskGraph:
+    def __init__(self, tasks: List[Task], ids: Dict[str, int], durations: List[int],
+                 deps_of: List[List[int]], children_of: List[List[int]], in_degree: array,
+                 dep_indptr: array, dep_indices: array):
+        self.tasks = tasks
+        self.ids = ids
+        self.durations = durations
+        self.deps_of = deps_of
+        self.children_of = children_of
+        self.in_degree = in_degree
+        self.dep_indptr = dep_indptr
+        self.dep_indices = dep_indices
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Task]) -> "TaskGraph":
+        ids = {task.name: tid for tid, task in enumerate(tasks)}
+        # Durations stay Python ints: parse_input accepts any positive value
+        durations = [task.duration for task in tasks]
+        deps_of = [[ids[d] for d in task.dependencies if d] for task in tasks]
+        children_of = [[] for _ in tasks]
+        dep_indptr = array('i', [0])
+        dep_indices = array('i')
+        for tid, task_deps in enumerate(deps_of):
+            for dep in task_deps:
+                children_of[dep].append(tid)
+            dep_indices.extend(task_deps)
+            dep_indptr.append(len(dep_indices))
+        in_degree = array('i', [len(task_deps) for task_deps in deps_of])
+        return cls(tasks, ids, durations, deps_of, children_of, in_degree, dep_indptr, dep_indices)
 
 # Parse input file into lisstrt of Tasks
 def parse_input(file_path: str) -> Tuple[Optional[List[Task]], Optional[str]]:
     tasks = []
     task_names = set()
+    # Tasks with identical parameters share one read-only view
+    param_cache = {}
     try:
-        with open(file_path, 'r') as f:
-            for line_nuem, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                parts = line.split(',')
-                if len(parts) != 5:
-                    return None, f"Line {line_num}: Expected 5 fields, got {len(parts)}"
-                
-                name, duration, deps, task_type, params = parts
-                # Validate name
-                if not name or name in task_names:
-                    return None, f"Line {line_num}: Invalid or duplicate name '{name}'"
-                task_names.add(name)
-                
-                # Validate duration
-                try:
-                    duration = int(duration)
-                    if duration <= 0:
-                        raise ValueError
-                except ValueError:
-                    return None, f"Line {line_num}: Invalid duration '{duration}'"
-                
-                # Parse dependencies
-                dependencies = deps.split(';') if deps else []
-                
-                # Validate task_type
-                if task_type not in ['resolve', 'traceroute', 'iperf3']:
-                    return None, f"Line {line_num}: Invalid task_type '{task_type}'"
-                
-                # Parse parameters
-                parameters = {}
-                for param in params.split(';'):
-                    if param:
-                        if '=' not in param:
-                            return None, f"Line {line_num}: Invalid parameter format '{param}'"
-                        key, value = param.split('=', 1)
-                        parameters[key] = value
-                
-                tasks.append(Task(name, duration, dependencies, task_type, parameters))
+        with open(file_path, 'r', buffering=1 << 20) as f:
+            lines = f.read().split('\n')
+        reader = csv.reader(map(str.strip, lines), quoting=csv.QUOTE_NONE)
+        for parts in reader:
+            line_num = reader.line_num
+            if not parts:
+                continue
+            if len(parts) != 5:
+                return None, f"Line {line_num}: Expected 5 fields, got {len(parts)}"
+            
+            name, duration, deps, task_type, params = parts
+            # Validate name
+            if not name or name in task_names:
+                return None, f"Line {line_num}: Invalid or duplicate name '{name}'"
+            task_names.add(name)
+            
+            # Validate duration
+            try:
+                duration = int(duration)
+                if duration <= 0:
+                    raise ValueError
+            except ValueError:
+                return None, f"Line {line_num}: Invalid duration '{duration}'"
+            
+            # Parse dependencies
+            dependencies = tuple(deps.split(';')) if deps else ()
+            
+            # Validate task_type
+            if task_type not in _SCHEMAS:
+                return None, f"Line {line_num}: Invalid task_type '{task_type}'"
+            task_type = sys.intern(task_type)
+            
+            # Parse parameters
+            parameters = {}
+            for param in params.split(';'):
+                if param:
+                    if '=' not in param:
+                        return None, f"Line {line_num}: Invalid parameter format '{param}'"
+                    key, value = param.split('=', 1)
+                    parameters[sys.intern(key)] = value
+            missing = _SCHEMAS[task_type] - parameters.keys()
+            if missing:
+                return None, f"Line {line_num}: Missing parameters for {task_type}: {', '.join(sorted(missing))}"
+            key = frozenset(parameters.items())
+            if key not in param_cache:
+                param_cache[key] = MappingProxyType(parameters)
+            parameters = param_cache[key]
+            
+            tasks.append(Task(name, duration, dependencies, task_type, parameters))
     
         # Validate dependencies exist
         for task in tasks:
@@ -72,73 +137,105 @@ def parse_input(file_path: str) -> Tuple[Optional[List[Task]], Optional[str]]:
     except Exception as e:
         return None, f"Error parsing file: {str(e)}"
 
-# Detect dependency cycles using DFS
-def detect_cycles(tasks: List[Task]) -> Optional[str]:
-    visited = set()
-    rec_stack = set()
-    
-    def dfs(task: Task) -> bool:
-        visited.add(task.name)
-        rec_stack.add(task.name)
-        for dep in task.dependencies:
-            if dep:
-                dep_task = next(t for t in tasks if t.name == dep)
-                if dep not in visited:
-                    if dfs(dep_task):
-                        return True
-                elif dep in rec_stack:
-                    return True
-        rec_stack.remove(task.name)
-        return False
-    
-    for task in tasks:
-        if task.name not in visited:
-            if dfs(task):
-                return "Dependency cycle detected"
-    return None
-
-# Calculate expected total runtime (critical path)
-def calculate_expected_runtime(tasks: List[Task]) -> int:
-    start_times = defaultdict(int)
-    finish_times = {}
-    for task in tasks:
+# Order task ids so every dependency precedes its dependents, rejecting cycles
+def topological_order(graph: TaskGraph) -> Tuple[Optional[List[int]], Optional[str]]:
+    sorter = TopologicalSorter(dict(enumerate(graph.deps_of)))
+    try:
+        return list(sorter.static_order()), None
+    except CycleError as e:
+        cycle = " -> ".join(graph.tasks[tid].name for tid in e.args[1])
+        return None, f"Dependency cycle detected: {cycle}"
+
+# Earliest finish time of each task when started as soon as its dependencies finish
+def expected_finish_times(graph: TaskGraph, order: List[int]) -> List[int]:
+    indptr, indices, durations = graph.dep_indptr, graph.dep_indices, graph.durations
+    # Python ints, since summed durations along a path are unbounded
+    finish_times = [0] * len(durations)
+    for tid in order:
         max_dep_finish = 0
-        for dep in task.dependencies:
-            if dep:
-                max_dep_finish = max(max_dep_finish, finish_times[dep])
-        start_times[task.name] = max_dep_finish
-        finish_times[task.name] = max_dep_finish + task.duration
-    return max(finish_times.values()) if finish_times else 0
-
-# Build system command from task
-def build_command(task: Task) -> str:
+        for i in range(indptr[tid], indptr[tid + 1]):
+            dep_finish = finish_times[indices[i]]
+            if dep_finish > max_dep_finish:
+                max_dep_finish = dep_finish
+        finish_times[tid] = max_dep_finish + durations[tid]
+    return finish_times
+
+# Calculate expected total runtime (critical path) over a topological order
+def calculate_expected_runtime(graph: TaskGraph, order: List[int]) -> int:
+    return max(expected_finish_times(graph, order), default=0)
+
+# Build system command argv from task
+def build_command(task: Task) -> List[str]:
+    params = task.parameters
     if task.task_type == "resolve":
-        return f"dig +short {task.parameters['fqdn']}"
+        return ["dig", "+short", params["fqdn"]]
     elif task.task_type == "traceroute":
-        if task.parameters.get("tool") == "mtr":
-            return f"mtr -nz -c {task.parameters['count']} {task.parameters['endpoint']} --report"
+        if params.get("tool") == "mtr":
+            return ["mtr", "-nz", "-c", params["count"], params["endpoint"], "--report"]
         else:
-            return f"traceroute -q {task.parameters['count']} {task.parameters['endpoint']}"
+            return ["traceroute", "-q", params["count"], params["endpoint"]]
     elif task.task_type == "iperf3":
-        cmd = f"iperf3 -c {task.parameters['endpoint']} -p {task.parameters['port']} -t {task.parameters['duration']}"
-        return cmd
-    return ""
+        return ["iperf3", "-c", params["endpoint"], "-p", params["port"], "-t", params["duration"]]
+    return []
+
+# Reap subprocess exits through the event loop's selector via pidfds instead of
+# a blocking waitpid thread per child (Python 3.12+ already does this itself)
+def install_child_watcher(loop: asyncio.AbstractEventLoop):
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.set_child_watcher(watcher)
+
+# Resolve a program name to its absolute path once; subprocess only takes the
+# posix_spawn fast path when the executable path contains a directory. The
+# result is passed as `executable` so the child's argv[0] stays the bare name
+@lru_cache(maxsize=None)
+def resolve_executable(program: str) -> str:
+    return shutil.which(program) or program
+
+# Drain a subprocess pipe in chunks, keeping only a bounded tail of its output
+async def read_tail(stream: asyncio.StreamReader) -> bytes:
+    chunks = deque()
+    size = 0
+    while chunk := await stream.read(_READ_CHUNK_BYTES):
+        chunks.append(chunk)
+        size += len(chunk)
+        while size - len(chunks[0]) >= _OUTPUT_TAIL_BYTES:
+            size -= len(chunks.popleft())
+    return b"".join(chunks)[-_OUTPUT_TAIL_BYTES:]
 
-# Execute a task and capture output
-def execute_task(task: Task) -> Tuple[bool, str, float]:
-    command = build_command(task)
+# Execute a task on the event loop and capture output
+async def execute_task(task: Task) -> Tuple[bool, str, float]:
+    program, *args = build_command(task)
     start_time = time.time()
     try:
-        # Run command with timeout (duration + buffer)
-        result = subprocess.run(
-            command, shell=True, capture_output=True, text=True, timeout=task.duration + 10
+        # close_fds=False with no preexec_fn, cwd or new session lets CPython launch
+        # the child with posix_spawn instead of fork+exec; keep those unset
+        proc = await asyncio.create_subprocess_exec(
+            program, *args, executable=resolve_executable(program),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, close_fds=False,
         )
-        output = result.stdout if result.returncode == 0 else result.stderr
-        success = result.returncode == 0
+        try:
+            # Wait for the command with timeout (duration + buffer)
+            stdout, stderr, _ = await asyncio.wait_for(
+                asyncio.gather(read_tail(proc.stdout), read_tail(proc.stderr), proc.wait()),
+                timeout=task.duration + 10,
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        success = proc.returncode == 0
+        output = (stdout if success else stderr).decode(errors="replace")
         if task.task_type == "resolve" and success and not output.strip():
             success = False
             output = "No DNS records found"
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         success = False
         output = f"Task {task.name} timed out"
     except Exception as e:
@@ -147,71 +244,110 @@ def execute_task(task: Task) -> Tuple[bool, str, float]:
     duration = time.time() - start_time
     return success, output, duration
 
+# Mark every task downstream of a failed task as completed, returning them in BFS order
+def skip_dependents(graph: TaskGraph, failed: int, completed: bytearray) -> List[int]:
+    skipped = []
+    queue = deque([failed])
+    while queue:
+        for child in graph.children_of[queue.popleft()]:
+            if not completed[child]:
+                completed[child] = 1
+                skipped.append(child)
+                queue.append(child)
+    return skipped
+
 # Validation mode
 def validate_mode(file_path: str):
     tasks, error = parse_input(file_path)
     if error:
         print(f"Invalid input: {error}")
         return
-    cycle_error = detect_cycles(tasks)
+    graph = TaskGraph.from_tasks(tasks)
+    order, cycle_error = topological_order(graph)
     if cycle_error:
         print(f"Invalid input: {cycle_error}")
         return
-    expected_runtime = calculate_expected_runtime(tasks)
+    expected_runtime = calculate_expected_runtime(graph, order)
     print(f"Input valid. Expected total runtime: {expected_runtime} seconds")
 
 # Execution mode with parallelism
-def run_mode(file_path: str):
+async def run_mode(file_path: str):
     tasks, error = parse_input(file_path)
     if error:
         print(f"Invalid input: {error}")
         return
-    cycle_error = detect_cycles(tasks)
+    graph = TaskGraph.from_tasks(tasks)
+    order, cycle_error = topological_order(graph)
     if cycle_error:
         print(f"Invalid input: {cycle_error}")
         return
-    expected_runtime = calculate_expected_runtime(tasks)
+    expected_runtime = calculate_expected_runtime(graph, order)
     
-    completed = set()
-    running = set()
+    names = [task.name for task in tasks]
+    remaining = array('i', graph.in_degree)
+    ready = deque(tid for tid, degree in enumerate(remaining) if degree == 0)
+
+    # One flag byte per task id
+    completed = bytearray(len(tasks))
     start_times = {}
     actual_durations = {}
     outputs = {}
+
+    async def start(tid: int) -> Tuple[bool, str, float]:
+        start_times[tid] = time.time()
+        print(f"Starting {names[tid]} at {start_times[tid] - global_start:.1f}s...")
+        return await execute_task(tasks[tid])
+
+    def record(tid: int, result: Tuple[bool, str, float]) -> bool:
+        success, output, duration = result
+        completed[tid] = 1
+        actual_durations[tid] = duration
+        outputs[tid] = output
+        print(f"Finished {names[tid]} at {time.time() - global_start:.1f}s")
+        if not success:
+            print(f"Error in {names[tid]}: {output}")
+        return success
+
+    async def run_independent(tid: int):
+        record(tid, await start(tid))
+
+    # Completed (tid, result) pairs, pushed by each task as it finishes
+    finished = asyncio.Queue()
+
+    async def run_dependent(tid: int):
+        finished.put_nowait((tid, await start(tid)))
+
+    install_child_watcher(asyncio.get_running_loop())
     global_start = time.time()
     
-    with ThreadPoolExecutor() as executor:
-        futures = {}
-        while len(completed) < len(tasks):
-            for task in tasks:
-                if task.name not in completed and task.name not in running:
-                    if all(dep in completed for dep in task.dependencies if dep):
-                        running.add(task.name)
-                        start_times[task.name] = time.time()
-                        print(f"Starting {task.name} at {start_times[task.name] - global_start:.1f}s...")
-                        futures[task.name] = executor.submit(execute_task, task)
-            
-            # Check completed tasks
-            done = [name for name, future in list(futures.items()) if future.done()]
-            for name in done:
-                success, output, duration = futures.pop(name).result()
-                running.remove(name)
-                completed.add(name)
-                actual_durations[name] = duration
-                outputs[name] = output
-                print(f"Finished {name} at {time.time() - global_start:.1f}s")
-                if not success:
-                    print(f"Error in {name}: {output}")
-                    # Skip dependent tasks
-                    for t in tasks:
-                        if name in t.dependencies and t.name not in completed:
-                            completed.add(t.name)
-                            outputs[t.name] = f"Skipped due to failure in {name}"
-                            print(f"Skipped {t.name} due to failure in {name}")
+    if len(ready) == len(tasks):
+        # No task has dependencies: launch everything, no readiness bookkeeping
+        await asyncio.gather(*(run_independent(tid) for tid in ready))
+    else:
+        async with asyncio.TaskGroup() as group:
+            in_flight = 0
+            while ready or in_flight:
+                while ready:
+                    group.create_task(run_dependent(ready.popleft()))
+                    in_flight += 1
+                
+                # Block until a running task finishes; no per-wakeup scan of in-flight tasks
+                tid, result = await finished.get()
+                in_flight -= 1
+                if record(tid, result):
+                    for child in graph.children_of[tid]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0 and not completed[child]:
+                            ready.append(child)
+                    continue
+                for child in skip_dependents(graph, tid, completed):
+                    outputs[child] = f"Skipped due to failure in {names[tid]}"
+                    print(f"Skipped {names[child]} due to failure in {names[tid]}")
     
     actual_runtime = time.time() - global_start
     print("\nTask Outputs:")
-    for task in tasks:
-        print(f"Task {task.name}: {outputs.get(task.name, 'No output')}")
+    for tid, name in enumerate(names):
+        print(f"Task {name}: {outputs.get(tid, 'No output')}")
     print(f"Actual runtime: {actual_runtime:.1f} seconds")
     print(f"Difference from expected: {actual_runtime - expected_runtime:.1f} seconds")
 
@@ -230,7 +366,7 @@ def main():
     if args.validate:
         validate_mode(args.file_path)
     else:
-        run_mode(args.file_path)
+        asyncio.run(run_mode(args.file_path))
 
 if __name__ == "__main__":
     main()